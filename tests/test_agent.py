@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+import agent
+
+VALID_PARSER = '''import re
+import pandas as pd
+
+
+def parse(pdf_path: str) -> pd.DataFrame:
+    return pd.DataFrame({"Date": ["01-08-2024"], "Balance": [6864.58]})
+'''
+
+
+@pytest.mark.parametrize("code", [
+    VALID_PARSER,
+    VALID_PARSER.replace("import pandas as pd\n", "from pandas import DataFrame\n")
+    .replace("pd.DataFrame", "DataFrame"),
+])
+def test_validate_parser_accepts_contract(code):
+    agent._validate_parser(code, "parser.py")
+
+
+@pytest.mark.parametrize("code, message", [
+    (VALID_PARSER.replace("def parse(", "def parse_statement("), "missing def parse"),
+    (VALID_PARSER.replace("pdf_path: str)", "pdf_path: str, password: str)"), "missing def parse"),
+    (VALID_PARSER.replace(" -> pd.DataFrame", ""), "missing def parse"),
+    (VALID_PARSER.replace(" -> pd.DataFrame", " -> dict"), "missing def parse"),
+    (VALID_PARSER.replace("import re\n", ""), "missing required imports: re"),
+])
+def test_validate_parser_contract(code, message):
+    with pytest.raises(ValueError, match=message):
+        agent._validate_parser(code, "parser.py")
+
+
+@pytest.mark.parametrize("code", [
+    VALID_PARSER + "\ndef broken(:\n",
+    VALID_PARSER + "\nreturn None\n",
+])
+def test_validate_parser_rejects_invalid_code(code):
+    with pytest.raises(SyntaxError):
+        agent._validate_parser(code, "parser.py")
+
+
+@pytest.mark.parametrize("text, code", [
+    ("import re", "import re"),
+    ("```python\nimport re\n```", "import re"),
+    ("Here it is:\n```\nimport re\n```\nDone.", "import re"),
+    ("```python\nimport re\n", "import re"),
+    ("```import re```", "import re"),
+])
+def test_strip_code_fences(text, code):
+    assert agent._strip_code_fences(text) == code
+
+
+@pytest.fixture
+def expected_csv(tmp_path):
+    path = tmp_path / "expected.csv"
+    path.write_text("Date,Balance\n01-08-2024,6864.58\n")
+    return str(path)
+
+
+def run_parser(tmp_path, expected_csv, code):
+    parser_path = tmp_path / "parser.py"
+    parser_path.write_text(code)
+    return asyncio.run(agent._execute_parser(str(parser_path), "statement.pdf", expected_csv))
+
+
+def test_execute_parser_matching_output(tmp_path, expected_csv):
+    assert run_parser(tmp_path, expected_csv, VALID_PARSER) is None
+
+
+def test_execute_parser_reports_mismatch(tmp_path, expected_csv):
+    message = run_parser(tmp_path, expected_csv, VALID_PARSER.replace("01-08-2024", "02-08-2024"))
+    assert message.startswith("Parser output does not match expected CSV")
+
+
+def test_execute_parser_reports_error(tmp_path, expected_csv):
+    code = VALID_PARSER.replace("    return", "    raise RuntimeError('no table found')\n    return")
+    message = run_parser(tmp_path, expected_csv, code)
+    assert message.startswith("Parser raised an error")
+    assert "RuntimeError: no table found" in message
+
+
+def test_execute_parser_times_out(tmp_path, expected_csv, monkeypatch):
+    monkeypatch.setattr(agent, "PARSER_TIMEOUT", 0.5)
+    code = VALID_PARSER.replace("    return", "    import time\n    time.sleep(30)\n    return")
+    assert run_parser(tmp_path, expected_csv, code) == "Parser did not finish within 0.5 seconds"
+
+
+@pytest.fixture
+def karbon(tmp_path, monkeypatch):
+    # CUSTOM_PARSER_DIR and LLM_CACHE_DIR are relative, so this keeps them out of the repo
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return agent.KarbonAgent()
+
+
+def parser_state(expected_csv, code, cache_key="0" * 64):
+    return {
+        "target_bank": "icici",
+        "sample_pdf_path": "statement.pdf",
+        "sample_csv_path": expected_csv,
+        "parser_output_path": str(agent.CUSTOM_PARSER_DIR / "icici_parser.py"),
+        "generated_code": code,
+        "generated_cache_key": cache_key,
+    }
+
+
+def test_testing_node_stores_passing_code(karbon, expected_csv):
+    state = parser_state(expected_csv, VALID_PARSER)
+    result = asyncio.run(karbon.testing_node(state))
+    assert result["is_success"]
+    assert karbon._cached_response(state["generated_cache_key"]) == VALID_PARSER
+
+
+@pytest.mark.parametrize("code", [
+    VALID_PARSER.replace("01-08-2024", "02-08-2024"),
+    VALID_PARSER.replace("import re\n", ""),
+])
+def test_testing_node_evicts_failing_code(karbon, expected_csv, code):
+    state = parser_state(expected_csv, code)
+    karbon._store_response(state["generated_cache_key"], code)
+    result = asyncio.run(karbon.testing_node(state))
+    assert not result["is_success"]
+    assert karbon._cached_response(state["generated_cache_key"]) is None